@@ -0,0 +1,184 @@
+import os
+import math
+import time
+import logging
+import threading
+from flask import g, request, jsonify
+from gunicorn_config import threads as WORKER_THREADS
+
+logger = logging.getLogger(__name__)
+
+# Seconds a request may wait for a slot before it is shed with 503
+ADMISSION_QUEUE_SECONDS = float(os.environ.get('ADMISSION_QUEUE_SECONDS', 0.5))
+
+# Threads per worker kept free of heavy requests, so light requests like /health always find one
+ADMISSION_RESERVED_LIGHT = int(os.environ.get('ADMISSION_RESERVED_LIGHT', 2))
+
+# Heavy requests may occupy at most this many of the worker's threads, counting both
+# the ones running and the ones waiting for a lane slot
+HEAVY_MAX_THREADS = max(1, WORKER_THREADS - ADMISSION_RESERVED_LIGHT)
+
+# Lanes are per worker process and sized from the gunicorn thread count (see gunicorn_config.py)
+LANES = {
+    "heavy": {
+        "max_concurrency": int(os.environ.get('ADMISSION_HEAVY_CONCURRENCY', 3)),
+        "max_cost": float(os.environ.get('ADMISSION_HEAVY_COST', 30)),
+        "max_waiting": int(os.environ.get('ADMISSION_HEAVY_QUEUE', HEAVY_MAX_THREADS))
+    },
+    "light": {
+        "max_concurrency": int(os.environ.get('ADMISSION_LIGHT_CONCURRENCY', WORKER_THREADS)),
+        "max_cost": None,
+        "max_waiting": int(os.environ.get('ADMISSION_LIGHT_QUEUE', WORKER_THREADS))
+    }
+}
+
+# Endpoints that go to the heavy lane; everything else (health, skill levels, analytics) is light
+HEAVY_ENDPOINTS = ['/parse-resume', '/generate-roadmap']
+
+# Per-endpoint concurrency limits, applied on top of the lane limits
+ENDPOINT_LIMITS = {
+    '/parse-resume': int(os.environ.get('ADMISSION_PARSE_CONCURRENCY', 2)),
+    '/generate-roadmap': int(os.environ.get('ADMISSION_ROADMAP_CONCURRENCY', 2))
+}
+
+# Relative parsing cost per MB of upload, by format (textract formats shell out and are the slowest).
+# Admission runs before the upload is read, so the format comes from an optional ?format= hint;
+# uploads without one are costed as the slowest formats.
+FORMAT_COST_PER_MB = {
+    'pdf': 6.0,
+    'doc': 8.0,
+    'rtf': 8.0,
+    'docx': 3.0,
+    'txt': 1.0
+}
+
+# Fast mode skips spaCy and the education/experience passes (from the ?mode= hint)
+FAST_MODE_COST_FACTOR = 0.2
+
+# Approximate size of one {"skill": "level"} entry in a /generate-roadmap body
+ROADMAP_BYTES_PER_SKILL = 32
+
+
+class Limiter:
+    """Bounds the number (and optionally total cost) of requests in flight"""
+
+    def __init__(self, name, max_concurrency, max_cost=None, max_waiting=0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_cost = max_cost
+        self.max_waiting = max_waiting
+        self.in_flight = 0
+        self.cost_in_flight = 0.0
+        self.waiting = 0
+        # Moving average of request duration, used for Retry-After
+        self.avg_seconds = 1.0
+        self._condition = threading.Condition()
+
+    def _fits(self, cost):
+        if self.in_flight >= self.max_concurrency:
+            return False
+        # A single request larger than the whole budget may still run on its own
+        return self.max_cost is None or self.in_flight == 0 or self.cost_in_flight + cost <= self.max_cost
+
+    def acquire(self, cost, deadline):
+        with self._condition:
+            if not self._fits(cost):
+                if self.waiting >= self.max_waiting:
+                    return False
+                self.waiting += 1
+                try:
+                    while not self._fits(cost):
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            return False
+                        self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+            self.cost_in_flight += cost
+            return True
+
+    def release(self, cost, duration=None):
+        with self._condition:
+            self.in_flight -= 1
+            self.cost_in_flight = max(0.0, self.cost_in_flight - cost)
+            if duration is not None:
+                self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * duration
+            self._condition.notify_all()
+
+    def retry_after(self):
+        return max(1, int(math.ceil(self.avg_seconds)))
+
+
+lanes = {name: Limiter(name, **config) for name, config in LANES.items()}
+
+# Held by a heavy request from admission until teardown; never queues, so heavy requests
+# beyond the budget are shed instead of taking a thread to wait
+heavy_threads = Limiter("heavy threads", HEAVY_MAX_THREADS)
+
+# Endpoint limiters and the heavy lane queue only within the heavy_threads budget
+endpoint_limiters = {
+    path: Limiter(path, limit, max_waiting=HEAVY_MAX_THREADS) for path, limit in ENDPOINT_LIMITS.items()
+}
+
+
+def estimate_cost():
+    """Estimate the relative cost of the current request from its size and query hints, without reading the body"""
+    content_length = request.content_length or 0
+    if request.path == '/parse-resume':
+        size_mb = content_length / (1024.0 * 1024.0)
+        cost = 1.0 + FORMAT_COST_PER_MB.get(request.args.get('format', '').lower(), 8.0) * size_mb
+        if request.args.get('mode') == 'fast':
+            cost *= FAST_MODE_COST_FACTOR
+        return cost
+    if request.path == '/generate-roadmap':
+        # Each skill costs two upstream lookups plus ranking
+        return 1.0 + 0.5 * content_length / ROADMAP_BYTES_PER_SKILL
+    return 1.0
+
+
+def shed(limiter):
+    retry_after = limiter.retry_after()
+    logger.warning(f"Shedding {request.method} {request.path}: {limiter.name} is full, retry after {retry_after}s")
+    response = jsonify({"success": False, "error": "Service is busy, please retry later"})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def before_request():
+    heavy = request.path in HEAVY_ENDPOINTS and request.method != 'OPTIONS'
+    lane = lanes["heavy" if heavy else "light"]
+    endpoint_limiter = endpoint_limiters.get(request.path) if heavy else None
+    cost = estimate_cost() if heavy else 1.0
+    deadline = time.time() + ADMISSION_QUEUE_SECONDS
+
+    # heavy_threads is taken first and never waits, so everything after it (queueing,
+    # and the view reading the upload) happens on a thread already counted against the budget
+    acquired = []
+    for limiter in [heavy_threads if heavy else None, endpoint_limiter, lane]:
+        if limiter is None:
+            continue
+        if not limiter.acquire(cost, deadline):
+            for held in acquired:
+                held.release(cost)
+            return shed(limiter)
+        acquired.append(limiter)
+
+    g.admission = (acquired, cost, time.time())
+
+
+def teardown_request(exception=None):
+    admission = g.pop('admission', None)
+    if admission is None:
+        return
+    acquired, cost, start_time = admission
+    duration = time.time() - start_time
+    for limiter in acquired:
+        limiter.release(cost, duration)
+
+
+def init_app(app):
+    """Register admission control on a Flask app"""
+    app.before_request(before_request)
+    app.teardown_request(teardown_request)
@@ -0,0 +1,355 @@
+import os
+import re
+import glob
+import json
+import time
+import fcntl
+import shutil
+import logging
+import tempfile
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.environ.get('ANALYTICS_DATA_DIR', 'data')
+ANALYTICS_DIR = os.path.join(DATA_DIR, 'analytics')
+
+# Rollups, snapshots and the watermark of one run live together in a numbered
+# generation directory under STATE_DIR; CURRENT_PATH names the committed one, so a
+# run's outputs become visible all at once or not at all
+STATE_DIR = os.path.join(ANALYTICS_DIR, 'state')
+CURRENT_PATH = os.path.join(ANALYTICS_DIR, 'CURRENT')
+
+# Held for the duration of a run so overlapping runs cannot process the same files twice
+LOCK_PATH = os.path.join(ANALYTICS_DIR, 'run.lock')
+
+# Files modified more recently than this may still be being written and are left for the next run
+SETTLE_SECONDS = 2.0
+
+SOURCE_PATTERNS = {
+    "resumes": re.compile(r'^(?P<user_id>.+)_(?P<timestamp>\d+)_parsed_resume\.json$'),
+    "skill_levels": re.compile(r'^(?P<user_id>.+)_skill_levels\.json$'),
+    "roadmaps": re.compile(r'^(?P<user_id>.+)_roadmap\.json$')
+}
+
+# Datasets whose source files are rewritten in place (one file per user). Only the
+# timestamped resume files are append-only; for these, a file's previous rows are
+# kept in a snapshot and replaced in the rollups rather than counted again.
+OVERWRITTEN_DATASETS = ["skill_levels", "roadmaps"]
+
+# Rollups: name -> (dataset, grouping columns); each counts rows per group
+ROLLUPS = {
+    "skill_counts": ("resumes", ["date", "category", "skill"]),
+    "level_counts": ("skill_levels", ["date", "skill", "level"]),
+    "roadmap_counts": ("roadmaps", ["date", "skill", "level"])
+}
+
+GRANULARITIES = {"day": None, "week": "W", "month": "M"}
+
+
+def current_generation():
+    """Return the number of the last committed generation (0 before the first run)"""
+    if not os.path.exists(CURRENT_PATH):
+        return 0
+    with open(CURRENT_PATH, 'r') as f:
+        return int(f.read().strip())
+
+
+def generation_dir(generation):
+    return os.path.join(STATE_DIR, f"{generation:08d}")
+
+
+def commit_generation(generation):
+    """Make a staged generation the current one with a single atomic rename"""
+    def write(temp_path):
+        with open(temp_path, 'w') as f:
+            f.write(str(generation))
+    write_atomic(CURRENT_PATH, write)
+
+
+def load_watermark(state_dir):
+    """Return the last processed modification time and the files processed at exactly that time"""
+    path = os.path.join(state_dir, 'watermark.json')
+    if not os.path.exists(path):
+        return {"mtime": 0.0, "files": []}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_watermark(state_dir, watermark):
+    with open(os.path.join(state_dir, 'watermark.json'), 'w') as f:
+        json.dump(watermark, f)
+
+
+def write_atomic(path, write):
+    """Write a file via a temporary file and rename so readers never see partial output"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def find_new_files(watermark):
+    """List (mtime, dataset, name, match) for source files changed since the watermark"""
+    cutoff = time.time() - SETTLE_SECONDS
+    seen_at_watermark = set(watermark["files"])
+    new_files = []
+    for entry in os.scandir(DATA_DIR):
+        if not entry.is_file():
+            continue
+        for dataset, pattern in SOURCE_PATTERNS.items():
+            match = pattern.match(entry.name)
+            if not match:
+                continue
+            mtime = entry.stat().st_mtime
+            if mtime > cutoff:
+                break
+            if mtime > watermark["mtime"] or (mtime == watermark["mtime"] and entry.name not in seen_at_watermark):
+                new_files.append((mtime, dataset, entry.name, match))
+            break
+    return sorted(new_files)
+
+
+def rows_from_file(dataset, path, match, mtime):
+    """Flatten one source JSON file into analytics rows"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    user_id = match.group('user_id')
+    timestamp = pd.Timestamp.fromtimestamp(mtime)
+    base = {"user_id": user_id, "source_file": os.path.basename(path), "timestamp": timestamp,
+            "date": timestamp.strftime('%Y-%m-%d')}
+
+    rows = []
+    if dataset == "resumes":
+        if not data.get("success"):
+            return rows
+        categorized = set()
+        for category, skills in data.get("categorized_skills", {}).items():
+            for skill in skills:
+                rows.append(dict(base, category=category, skill=skill.lower()))
+                categorized.add(skill.lower())
+        for skill in data.get("skills", []):
+            if skill.lower() not in categorized:
+                rows.append(dict(base, category="uncategorized", skill=skill.lower()))
+    elif dataset == "skill_levels":
+        for skill, level in data.get("skill_levels", {}).items():
+            rows.append(dict(base, skill=skill.lower(), level=str(level)))
+    elif dataset == "roadmaps":
+        for skill in data.get("skills", []):
+            rows.append(dict(base, skill=skill["name"].lower(), level=str(skill.get("level")),
+                             resources=len(skill.get("resources", []))))
+    return rows
+
+
+def rollup_path(name, state_dir=None):
+    state_dir = state_dir or generation_dir(current_generation())
+    return os.path.join(state_dir, 'rollups', f"{name}.parquet")
+
+
+def snapshot_path(dataset, state_dir):
+    return os.path.join(state_dir, 'snapshots', f"{dataset}.parquet")
+
+
+def replace_snapshot(state_dir, dataset, frame, source_files):
+    """Swap the snapshot rows of the given source files for their new rows; returns the rows replaced"""
+    path = snapshot_path(dataset, state_dir)
+    snapshot = pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame(columns=["source_file"])
+    replaced = snapshot["source_file"].isin(source_files)
+    previous = snapshot[replaced]
+    snapshot = pd.concat([snapshot[~replaced], frame], ignore_index=True)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    snapshot.to_parquet(path, index=False)
+    return previous
+
+
+def write_partitions(dataset, frame, generation):
+    """Write one part file per date partition, named after the generation that owns it"""
+    for date, rows in frame.groupby("date"):
+        directory = os.path.join(ANALYTICS_DIR, dataset, f"date={date}")
+        os.makedirs(directory, exist_ok=True)
+        rows.drop(columns=["date"]).to_parquet(os.path.join(directory, f"part-{generation:08d}.parquet"), index=False)
+
+
+def discard_uncommitted(committed):
+    """Remove part files and staged state left behind by runs that never committed"""
+    for path in glob.glob(os.path.join(ANALYTICS_DIR, '*', 'date=*', 'part-*.parquet')):
+        if int(os.path.basename(path)[len('part-'):-len('.parquet')]) > committed:
+            os.remove(path)
+    for path in glob.glob(os.path.join(STATE_DIR, '*')):
+        # The previous generation is kept for readers that resolved CURRENT just before a commit
+        generation = int(os.path.basename(path))
+        if generation > committed or generation < committed - 1:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def update_rollup(state_dir, name, frame, previous=None):
+    """Merge the counts of new rows into a stored rollup, subtracting the rows they replace"""
+    _, columns = ROLLUPS[name]
+    counts = [frame.groupby(columns).size().reset_index(name="count")]
+    if previous is not None and not previous.empty:
+        removed = previous.groupby(columns).size().reset_index(name="count")
+        removed["count"] = -removed["count"]
+        counts.append(removed)
+
+    path = rollup_path(name, state_dir)
+    if os.path.exists(path):
+        counts.insert(0, pd.read_parquet(path))
+    new_counts = pd.concat(counts, ignore_index=True).groupby(columns, as_index=False)["count"].sum()
+    new_counts = new_counts[new_counts["count"] > 0]
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    new_counts.to_parquet(path, index=False)
+
+
+def run():
+    """Compact source files added since the last run into partitioned Parquet and update rollups"""
+    os.makedirs(ANALYTICS_DIR, exist_ok=True)
+    with open(LOCK_PATH, 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info("Another analytics run is in progress, skipping")
+            return 0
+        return compact()
+
+
+def compact():
+    """Stage a new generation from the committed one plus new source files, then commit it"""
+    committed = current_generation()
+    discard_uncommitted(committed)
+    watermark = load_watermark(generation_dir(committed))
+    new_files = find_new_files(watermark)
+    if not new_files:
+        logger.info("No new files to compact")
+        return 0
+
+    # Nothing below is visible to readers or the next run until commit_generation
+    generation = committed + 1
+    state_dir = generation_dir(generation)
+    if os.path.exists(generation_dir(committed)):
+        shutil.copytree(generation_dir(committed), state_dir)
+    else:
+        os.makedirs(state_dir)
+
+    rows = {dataset: [] for dataset in SOURCE_PATTERNS}
+    read_files = {dataset: [] for dataset in SOURCE_PATTERNS}
+    for mtime, dataset, name, match in new_files:
+        try:
+            rows[dataset].extend(rows_from_file(dataset, os.path.join(DATA_DIR, name), match, mtime))
+            read_files[dataset].append(name)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Skipping unreadable analytics source {name}: {e}")
+
+    for dataset, dataset_rows in rows.items():
+        if not read_files[dataset]:
+            continue
+        frame = pd.DataFrame(dataset_rows)
+        previous = None
+        if dataset in OVERWRITTEN_DATASETS:
+            # A rewritten file (even one that is now empty) replaces what it contributed before
+            previous = replace_snapshot(state_dir, dataset, frame, read_files[dataset])
+        if frame.empty and (previous is None or previous.empty):
+            continue
+        if not frame.empty:
+            write_partitions(dataset, frame, generation)
+        for name, (rollup_dataset, columns) in ROLLUPS.items():
+            if rollup_dataset == dataset:
+                update_rollup(state_dir, name, frame.reindex(columns=columns), previous)
+
+    last_mtime = new_files[-1][0]
+    files_at_last_mtime = [name for mtime, _, name, _ in new_files if mtime == last_mtime]
+    if last_mtime == watermark["mtime"]:
+        files_at_last_mtime.extend(watermark["files"])
+    save_watermark(state_dir, {"mtime": last_mtime, "files": files_at_last_mtime})
+
+    # Rollups, snapshots, watermark and part files all become current together
+    commit_generation(generation)
+
+    logger.info(f"Compacted {len(new_files)} files into {ANALYTICS_DIR}")
+    return len(new_files)
+
+
+_rollup_cache = {}
+
+
+def read_rollup(name):
+    """Read a rollup, reusing the cached frame until the file changes"""
+    path = rollup_path(name)
+    if not os.path.exists(path):
+        _, columns = ROLLUPS[name]
+        return pd.DataFrame(columns=columns + ["count"])
+    # Each committed generation has its own path, so (path, mtime) identifies one version
+    version = (path, os.path.getmtime(path))
+    cached = _rollup_cache.get(name)
+    if cached is None or cached[0] != version:
+        cached = (version, pd.read_parquet(path))
+        _rollup_cache[name] = cached
+    return cached[1]
+
+
+def filter_rollup(frame, skills=None, start=None, end=None):
+    if skills:
+        frame = frame[frame["skill"].isin(skills)]
+    if start:
+        frame = frame[frame["date"] >= start]
+    if end:
+        frame = frame[frame["date"] <= end]
+    return frame
+
+
+def to_period(dates, granularity):
+    if GRANULARITIES[granularity] is None:
+        return dates
+    periods = pd.to_datetime(dates).dt.to_period(GRANULARITIES[granularity])
+    return periods.dt.start_time.dt.strftime('%Y-%m-%d')
+
+
+def query_skill_trends(skills=None, category=None, start=None, end=None, granularity="day", top=20):
+    """Answer skill trend queries from the rollups"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}. Use one of: {', '.join(GRANULARITIES)}")
+    skills = [skill.lower() for skill in skills] if skills else None
+
+    counts = filter_rollup(read_rollup("skill_counts"), skills, start, end)
+    if category:
+        counts = counts[counts["category"] == category]
+
+    if counts.empty:
+        return {"granularity": granularity, "series": [], "levels": {}}
+
+    totals = counts.groupby("skill")["count"].sum().sort_values(ascending=False)
+    if not skills:
+        totals = totals.head(top)
+    counts = counts[counts["skill"].isin(totals.index)].assign(period=lambda df: to_period(df["date"], granularity))
+    per_period = counts.groupby(["skill", "period"], as_index=False)["count"].sum()
+    categories = counts.groupby("skill")["category"].first()
+
+    series = []
+    for skill, total in totals.items():
+        points = per_period[per_period["skill"] == skill].sort_values("period")
+        series.append({
+            "skill": skill,
+            "category": categories.get(skill),
+            "total": int(total),
+            "points": [{"period": point["period"], "count": int(point["count"])}
+                       for point in points.to_dict('records')]
+        })
+
+    levels = {}
+    level_counts = filter_rollup(read_rollup("level_counts"), list(totals.index), start, end)
+    for (skill, level), count in level_counts.groupby(["skill", "level"])["count"].sum().items():
+        levels.setdefault(skill, {})[level] = int(count)
+
+    return {"granularity": granularity, "series": series, "levels": levels}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    run()
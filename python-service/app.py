@@ -5,13 +5,18 @@ import tempfile
 import json
 import logging
 import time
-from resume_parser import parse_resume
+from resume_parser import parse_resume, PARSE_MODES
+from profiling import profile_request
+from analytics import query_skill_trends
+from resilience import ResilientProvider
+import admission
 from werkzeug.utils import secure_filename
 import spacy
 import re
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import requests
+import httplib2
 from googleapiclient.discovery import build
 import nltk
 from nltk.corpus import stopwords
@@ -29,6 +34,7 @@ except Exception as e:
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+admission.init_app(app)  # Per-endpoint concurrency limits with heavy and light lanes
 
 # Load spaCy model
 try:
@@ -39,6 +45,14 @@ except Exception as e:
     os.system("python -m spacy download en_core_web_sm")
     nlp = spacy.load("en_core_web_sm")
 
+# Provider endpoints can be overridden to point at a stub server (see stub_providers.py)
+YOUTUBE_API_ENDPOINT = os.environ.get('YOUTUBE_API_ENDPOINT')
+CUSTOM_SEARCH_URL = os.environ.get('CUSTOM_SEARCH_URL', 'https://www.googleapis.com/customsearch/v1')
+
+# Upstream providers for roadmap resources, each with its own circuit breaker and latency tracking
+youtube_provider = ResilientProvider('YouTube')
+search_provider = ResilientProvider('Custom Search')
+
 # Create a data directory for storing parsed resume data
 os.makedirs('data', exist_ok=True)
 
@@ -65,12 +79,18 @@ def parse_resume_api():
         logger.warning(f"Unsupported file format: {file_extension}")
         return jsonify({"success": False, "error": "Unsupported file format. Please upload PDF, DOCX, DOC, TXT, or RTF"}), 400
     
+    mode = request.form.get('mode', request.args.get('mode', 'full'))
+    if mode not in PARSE_MODES:
+        logger.warning(f"Unsupported parse mode: {mode}")
+        return jsonify({"success": False, "error": f"Unsupported mode. Use one of: {', '.join(PARSE_MODES)}"}), 400
+    
     try:
         # Read file content
         file_content = file.read()
         
-        # Parse the resume
-        result = parse_resume(file_content, file_extension)
+        # Parse the resume (profiled when requested via X-Profile or sampling)
+        with profile_request('parse_resume', request.headers, file_content, file_extension) as profile:
+            result = parse_resume(file_content, file_extension, mode)
         
         # Log processing time
         processing_time = time.time() - start_time
@@ -83,7 +103,10 @@ def parse_resume_api():
         with open(save_path, 'w') as f:
             json.dump(result, f, indent=2)
         
-        return jsonify(result)
+        response = jsonify(result)
+        if profile.id:
+            response.headers['X-Profile-Id'] = profile.id
+        return response
     except Exception as e:
         logger.error(f"Error processing resume: {e}", exc_info=True)
         return jsonify({"success": False, "error": f"Failed to process resume: {str(e)}"}), 500
@@ -111,24 +134,25 @@ def generate_roadmap():
     user_id = data.get('user_id', 'anonymous')
     skill_levels = data.get('skill_levels', {})
     
-    # Get resources for each skill
+    # Get resources for each skill (profiled when requested via X-Profile or sampling)
     roadmap = {"skills": []}
     
-    for skill, level in skill_levels.items():
-        # Get resources from APIs
-        youtube_resources = get_youtube_resources(skill, level)
-        search_resources = get_search_resources(skill, level)
-        practice_resources = get_practice_resources(skill, level)
-        
-        # Combine and rank resources
-        all_resources = youtube_resources + search_resources + practice_resources
-        ranked_resources = rank_resources(all_resources, skill, level)
-        
-        roadmap["skills"].append({
-            "name": skill,
-            "level": level,
-            "resources": ranked_resources
-        })
+    with profile_request('generate_roadmap', request.headers, json.dumps(data), 'json') as profile:
+        for skill, level in skill_levels.items():
+            # Get resources from APIs
+            youtube_resources = get_youtube_resources(skill, level)
+            search_resources = get_search_resources(skill, level)
+            practice_resources = get_practice_resources(skill, level)
+            
+            # Combine and rank resources
+            all_resources = youtube_resources + search_resources + practice_resources
+            ranked_resources = rank_resources(all_resources, skill, level)
+            
+            roadmap["skills"].append({
+                "name": skill,
+                "level": level,
+                "resources": ranked_resources
+            })
     
     # Save roadmap to a file
     os.makedirs('data', exist_ok=True)
@@ -137,7 +161,10 @@ def generate_roadmap():
     with open(file_path, 'w') as f:
         json.dump(roadmap, f)
     
-    return jsonify(roadmap)
+    response = jsonify(roadmap)
+    if profile.id:
+        response.headers['X-Profile-Id'] = profile.id
+    return response
 
 def get_youtube_resources(skill, level):
     """Get YouTube resources for a skill and level"""
@@ -164,17 +191,19 @@ def get_youtube_resources(skill, level):
             }
         ]
     
-    try:
-        youtube = build('youtube', 'v3', developerKey=api_key)
-        
-        # Customize query based on skill level
-        query = f"{skill} tutorial"
-        if level == "beginner":
-            query = f"{skill} tutorial for beginners"
-        elif level == "intermediate":
-            query = f"{skill} intermediate tutorial"
-        elif level == "advanced":
-            query = f"{skill} advanced tutorial"
+    # Customize query based on skill level
+    query = f"{skill} tutorial"
+    if level == "beginner":
+        query = f"{skill} tutorial for beginners"
+    elif level == "intermediate":
+        query = f"{skill} intermediate tutorial"
+    elif level == "advanced":
+        query = f"{skill} advanced tutorial"
+    
+    def fetch(timeout):
+        client_options = {'api_endpoint': YOUTUBE_API_ENDPOINT} if YOUTUBE_API_ENDPOINT else None
+        youtube = build('youtube', 'v3', developerKey=api_key, client_options=client_options,
+                        http=httplib2.Http(timeout=timeout))
         
         # Call the search.list method to retrieve results
         search_response = youtube.search().list(
@@ -202,8 +231,8 @@ def get_youtube_resources(skill, level):
             })
         
         return videos
-    except Exception as e:
-        logger.error(f"Error fetching YouTube resources: {e}", exc_info=True)
+    
+    def fallback():
         return [
             {
                 "type": "video",
@@ -214,6 +243,9 @@ def get_youtube_resources(skill, level):
                 "popularity": 0.9
             }
         ]
+    
+    # Circuit breaker, adaptive timeout and hedging; serves cached or fallback data when YouTube degrades
+    return youtube_provider.call((skill.lower(), level), fetch, fallback)
 
 def get_search_resources(skill, level):
     """Get web resources using Google Custom Search API"""
@@ -241,18 +273,18 @@ def get_search_resources(skill, level):
             }
         ]
     
-    try:
-        # Customize query based on skill level
-        query = f"best website to learn {skill}"
-        if level == "beginner":
-            query = f"best website to learn {skill} for beginners"
-        elif level == "intermediate":
-            query = f"best {skill} intermediate tutorials"
-        elif level == "advanced":
-            query = f"advanced {skill} tutorials"
-        
+    # Customize query based on skill level
+    query = f"best website to learn {skill}"
+    if level == "beginner":
+        query = f"best website to learn {skill} for beginners"
+    elif level == "intermediate":
+        query = f"best {skill} intermediate tutorials"
+    elif level == "advanced":
+        query = f"advanced {skill} tutorials"
+    
+    def fetch(timeout):
         # Call the Custom Search API
-        url = "https://www.googleapis.com/customsearch/v1"
+        url = CUSTOM_SEARCH_URL
         params = {
             'q': query,
             'key': api_key,
@@ -260,7 +292,8 @@ def get_search_resources(skill, level):
             'num': 5
         }
         
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=timeout)
+        response.raise_for_status()
         data = response.json()
         
         if 'items' not in data:
@@ -281,8 +314,8 @@ def get_search_resources(skill, level):
             })
         
         return websites
-    except Exception as e:
-        logger.error(f"Error fetching search resources: {e}", exc_info=True)
+    
+    def fallback():
         return [
             {
                 "type": "course",
@@ -293,6 +326,9 @@ def get_search_resources(skill, level):
                 "popularity": 0.85
             }
         ]
+    
+    # Circuit breaker, adaptive timeout and hedging; serves cached or fallback data when Custom Search degrades
+    return search_provider.call((skill.lower(), level), fetch, fallback)
 
 def get_practice_resources(skill, level):
     """Get practice resources for a skill"""
@@ -411,6 +447,28 @@ def rank_resources(resources, skill, level):
     
     return ranked_resources[:5]  # Return top 5 resources
 
+@app.route('/analytics/skills', methods=['GET'])
+def analytics_skills():
+    """Skill frequency trends and level distributions, answered from precomputed rollups"""
+    skills = [skill for skill in request.args.get('skills', '').split(',') if skill]
+    
+    try:
+        result = query_skill_trends(
+            skills=skills,
+            category=request.args.get('category'),
+            start=request.args.get('start'),
+            end=request.args.get('end'),
+            granularity=request.args.get('granularity', 'day'),
+            top=int(request.args.get('top', 20))
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error querying skill analytics: {e}", exc_info=True)
+        return jsonify({"success": False, "error": f"Failed to query analytics: {str(e)}"}), 500
+    
+    return jsonify({"success": True, **result})
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -0,0 +1,92 @@
+"""Compare fast (spaCy-free) skill extraction against full mode on a corpus of resumes.
+
+Reports per-document and overall recall and precision of mode=fast relative to
+mode=full, along with the average extraction time of each mode.
+
+Example:
+    python evaluate_fast_mode.py samples/ --output fast_mode_report.json
+"""
+import os
+import json
+import time
+import argparse
+
+from resume_parser import extract_text_from_resume, extract_skills, extract_skills_fast
+
+RESUME_EXTENSIONS = ['pdf', 'docx', 'doc', 'txt', 'rtf']
+
+
+def evaluate_document(text):
+    start_time = time.perf_counter()
+    full_skills = set(extract_skills(text)["skills"])
+    full_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    fast_skills = set(extract_skills_fast(text)["skills"])
+    fast_time = time.perf_counter() - start_time
+
+    return full_skills, fast_skills, full_time, fast_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure fast-mode recall against full mode")
+    parser.add_argument('corpus', help="Directory of sample resumes")
+    parser.add_argument('--output', help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    documents = []
+    total_full, total_fast, total_common = 0, 0, 0
+    total_full_time, total_fast_time = 0.0, 0.0
+
+    for name in sorted(os.listdir(args.corpus)):
+        extension = name.rsplit('.', 1)[-1].lower()
+        if extension not in RESUME_EXTENSIONS:
+            continue
+        text = extract_text_from_resume(os.path.join(args.corpus, name), extension)
+        if not text or len(text.strip()) < 100:
+            continue
+
+        full_skills, fast_skills, full_time, fast_time = evaluate_document(text)
+        common = full_skills & fast_skills
+        total_full += len(full_skills)
+        total_fast += len(fast_skills)
+        total_common += len(common)
+        total_full_time += full_time
+        total_fast_time += fast_time
+
+        documents.append({
+            "file": name,
+            "recall": round(len(common) / len(full_skills), 4) if full_skills else 1.0,
+            "precision": round(len(common) / len(fast_skills), 4) if fast_skills else 1.0,
+            "missed": sorted(full_skills - fast_skills),
+            "extra": sorted(fast_skills - full_skills),
+            "full_ms": round(full_time * 1000, 2),
+            "fast_ms": round(fast_time * 1000, 2)
+        })
+
+    if not documents:
+        raise SystemExit(f"No parseable resumes found in {args.corpus}")
+
+    report = {
+        "documents": len(documents),
+        "recall": round(total_common / total_full, 4) if total_full else 1.0,
+        "precision": round(total_common / total_fast, 4) if total_fast else 1.0,
+        "avg_full_ms": round(total_full_time / len(documents) * 1000, 2),
+        "avg_fast_ms": round(total_fast_time / len(documents) * 1000, 2),
+        "speedup": round(total_full_time / total_fast_time, 1) if total_fast_time else None,
+        "per_document": documents
+    }
+
+    for document in documents:
+        print(f"{document['file']:<40} recall {document['recall']:.2f}  precision {document['precision']:.2f}"
+              f"  full {document['full_ms']:>8.1f}ms  fast {document['fast_ms']:>6.1f}ms")
+    print(f"\n{report['documents']} documents: recall {report['recall']:.3f}, precision {report['precision']:.3f}, "
+          f"full {report['avg_full_ms']}ms/doc, fast {report['avg_fast_ms']}ms/doc, speedup {report['speedup']}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+import os
+
+# gunicorn settings (gunicorn -c gunicorn_config.py app:app). The app imports this module
+# too, so the provider pool and admission lanes are sized from the same thread count.
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Threaded workers so admission control can keep threads free for light requests like /health
+worker_class = 'gthread'
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = 120
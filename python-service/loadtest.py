@@ -0,0 +1,413 @@
+"""Concurrent load test for the resume parsing and roadmap endpoints.
+
+Starts the stub providers and one gunicorn instance per worker configuration,
+drives /parse-resume and /generate-roadmap at the requested concurrency (closed
+loop) or request rate (open loop), and reports throughput, latency percentiles,
+error rates and worker RSS over time.
+
+Example:
+    python loadtest.py --corpus samples/ --worker-class sync,gthread --workers 2,4 \\
+        --concurrency 4,16 --duration 60 --output results.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import signal
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from stub_providers import start_stub_server, add_stub_arguments, stub_config_from_args
+
+logger = logging.getLogger(__name__)
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+RESUME_EXTENSIONS = ['pdf', 'docx', 'doc', 'txt', 'rtf']
+
+SAMPLE_SKILLS = [
+    "python", "javascript", "react", "docker", "kubernetes", "sql", "aws", "machine learning",
+    "java", "go", "terraform", "pandas", "node.js", "typescript", "linux", "git"
+]
+
+LEVELS = ["beginner", "intermediate", "advanced"]
+
+
+def load_corpus(corpus_dir):
+    """Load sample resumes as (filename, bytes) pairs, generating text resumes if no corpus is given"""
+    corpus = []
+    if corpus_dir:
+        for name in sorted(os.listdir(corpus_dir)):
+            if name.rsplit('.', 1)[-1].lower() in RESUME_EXTENSIONS:
+                with open(os.path.join(corpus_dir, name), 'rb') as f:
+                    corpus.append((name, f.read()))
+        if not corpus:
+            raise SystemExit(f"No resumes ({', '.join(RESUME_EXTENSIONS)}) found in {corpus_dir}")
+        return corpus
+
+    rng = random.Random(0)
+    for i in range(20):
+        skills = rng.sample(SAMPLE_SKILLS, 6)
+        text = "\n".join([
+            f"Candidate {i}",
+            "SUMMARY",
+            f"Software engineer with {rng.randint(1, 15)} years of experience in {skills[0]} and {skills[1]}.",
+            "EXPERIENCE",
+            f"Senior Developer at Company {i}, 2018 - present",
+            f"Built services using {skills[2]}, {skills[3]} and {skills[4]}.",
+            f"Software Engineer at Startup {i}, 2014 - 2018",
+            f"Worked on data pipelines with {skills[5]}.",
+            "EDUCATION",
+            f"Bachelor of Technology in Computer Science at State University, {rng.randint(2005, 2014)}",
+            "SKILLS",
+            ", ".join(skills)
+        ])
+        corpus.append((f"generated_{i}.txt", text.encode('utf-8')))
+    return corpus
+
+
+def make_request(session, base_url, endpoint, corpus, timeout):
+    """Send one request and return (status, latency); status is None on connection errors"""
+    start_time = time.perf_counter()
+    try:
+        if endpoint == 'parse-resume':
+            name, content = random.choice(corpus)
+            # The format hint lets admission cost the upload without reading it
+            params = {'format': name.rsplit('.', 1)[-1].lower()}
+            response = session.post(f"{base_url}/parse-resume", params=params, files={'file': (name, content)},
+                                    timeout=timeout)
+        else:
+            skills = random.sample(SAMPLE_SKILLS, random.randint(1, 5))
+            payload = {"user_id": "loadtest", "skill_levels": {skill: random.choice(LEVELS) for skill in skills}}
+            response = session.post(f"{base_url}/generate-roadmap", json=payload, timeout=timeout)
+        status = response.status_code
+    except requests.RequestException:
+        status = None
+    return status, time.perf_counter() - start_time
+
+
+def pick_endpoint(mix):
+    return random.choices(list(mix.keys()), weights=list(mix.values()))[0]
+
+
+def run_closed_loop(base_url, mix, corpus, concurrency, duration, timeout):
+    """Keep `concurrency` requests in flight for `duration` seconds"""
+    results = []
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def client():
+        session = requests.Session()
+        while time.time() < deadline:
+            endpoint = pick_endpoint(mix)
+            status, latency = make_request(session, base_url, endpoint, corpus, timeout)
+            with lock:
+                results.append((endpoint, status, latency))
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def run_open_loop(base_url, mix, corpus, concurrency, duration, timeout, rate):
+    """Issue requests at a fixed rate, measuring latency from their scheduled start"""
+    results = []
+    lock = threading.Lock()
+    local = threading.local()
+
+    def send(endpoint, scheduled):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        status, _ = make_request(local.session, base_url, endpoint, corpus, timeout)
+        # Include time spent queued for a client thread to avoid coordinated omission
+        with lock:
+            results.append((endpoint, status, time.perf_counter() - scheduled))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start_time = time.perf_counter()
+        total = int(rate * duration)
+        for i in range(total):
+            scheduled = start_time + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, pick_endpoint(mix), scheduled)
+    return results
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(results, elapsed):
+    """Aggregate raw (endpoint, status, latency) results per endpoint and overall"""
+    summary = {}
+    groups = {"all": results}
+    for endpoint in sorted({endpoint for endpoint, _, _ in results}):
+        groups[endpoint] = [result for result in results if result[0] == endpoint]
+
+    for name, group in groups.items():
+        latencies = [latency for _, _, latency in group]
+        statuses = {}
+        for _, status, _ in group:
+            key = str(status) if status is not None else "connection_error"
+            statuses[key] = statuses.get(key, 0) + 1
+        errors = sum(1 for _, status, _ in group if status is None or status >= 500)
+        summary[name] = {
+            "requests": len(group),
+            "throughput_rps": round(len(group) / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / len(group), 4) if group else 0.0,
+            "statuses": statuses,
+            "latency_ms": {
+                label: round(value * 1000, 1) if value is not None else None
+                for label, value in [
+                    ("p50", percentile(latencies, 50)),
+                    ("p90", percentile(latencies, 90)),
+                    ("p99", percentile(latencies, 99)),
+                    ("max", max(latencies) if latencies else None)
+                ]
+            }
+        }
+    return summary
+
+
+def worker_pids(master_pid):
+    """Return the pids of the gunicorn workers forked by master_pid"""
+    pids = []
+    task_dir = f"/proc/{master_pid}/task"
+    try:
+        for task in os.listdir(task_dir):
+            with open(os.path.join(task_dir, task, 'children')) as f:
+                pids.extend(int(pid) for pid in f.read().split())
+    except OSError:
+        pass
+    return pids
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return 0.0
+
+
+class RssSampler:
+    """Record the RSS of each gunicorn worker at a fixed interval"""
+
+    def __init__(self, master_pid, interval=1.0):
+        self.master_pid = master_pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._start_time = time.time()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            workers = {pid: round(rss_mb(pid), 1) for pid in worker_pids(self.master_pid)}
+            self.samples.append({
+                "t": round(time.time() - self._start_time, 1),
+                "total_rss_mb": round(sum(workers.values()), 1),
+                "workers": workers
+            })
+            if self._stop.wait(self.interval):
+                break
+
+
+def wait_for_health(base_url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def start_gunicorn(worker_class, workers, threads, port, env, work_dir):
+    """Start gunicorn serving app:app from the service directory"""
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '--bind', f"127.0.0.1:{port}",
+        '--workers', str(workers),
+        '--worker-class', worker_class,
+        '--timeout', '120',
+        '--pythonpath', SERVICE_DIR,
+        'app:app'
+    ]
+    # gunicorn silently switches sync workers to gthread when --threads > 1
+    if worker_class == 'gthread':
+        command[-1:-1] = ['--threads', str(threads)]
+    else:
+        threads = 1
+    # The app sizes its provider pool and admission lanes from the same thread count
+    env = dict(env, GUNICORN_THREADS=str(threads))
+    # Run from a scratch directory so parsed results do not land in the real data/
+    return subprocess.Popen(command, cwd=work_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def run_configuration(args, mix, corpus, stub_url, worker_class, workers, concurrency):
+    env = dict(os.environ)
+    env.update({
+        "YOUTUBE_API_KEY": "stub",
+        "GOOGLE_API_KEY": "stub",
+        "SEARCH_ENGINE_ID": "stub",
+        "YOUTUBE_API_ENDPOINT": f"{stub_url}/youtube/v3/",
+        "CUSTOM_SEARCH_URL": f"{stub_url}/customsearch/v1"
+    })
+    # By default every upload pays for a full parse; near-duplicate reuse would mostly measure the cache
+    env["RESUME_INDEX_ENABLED"] = "1" if args.enable_resume_index else "0"
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    with tempfile.TemporaryDirectory() as work_dir:
+        process = start_gunicorn(worker_class, workers, args.threads, args.port, env, work_dir)
+        try:
+            if not wait_for_health(base_url):
+                raise RuntimeError(f"gunicorn ({worker_class} x{workers}) did not become healthy")
+
+            sampler = RssSampler(process.pid, args.rss_interval)
+            sampler.start()
+            start_time = time.time()
+            if args.rate:
+                results = run_open_loop(base_url, mix, corpus, concurrency, args.duration, args.timeout, args.rate)
+            else:
+                results = run_closed_loop(base_url, mix, corpus, concurrency, args.duration, args.timeout)
+            elapsed = time.time() - start_time
+            sampler.stop()
+        finally:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    return {
+        "worker_class": worker_class,
+        "workers": workers,
+        "threads": args.threads if worker_class == 'gthread' else 1,
+        "concurrency": concurrency,
+        "rate": args.rate,
+        "duration_s": round(elapsed, 1),
+        "summary": summarize(results, elapsed),
+        "rss": sampler.samples
+    }
+
+
+def run_against_target(args, mix, corpus, concurrency):
+    """Drive an already running service (no gunicorn management or RSS sampling)"""
+    start_time = time.time()
+    if args.rate:
+        results = run_open_loop(args.target, mix, corpus, concurrency, args.duration, args.timeout, args.rate)
+    else:
+        results = run_closed_loop(args.target, mix, corpus, concurrency, args.duration, args.timeout)
+    elapsed = time.time() - start_time
+    return {
+        "target": args.target,
+        "concurrency": concurrency,
+        "rate": args.rate,
+        "duration_s": round(elapsed, 1),
+        "summary": summarize(results, elapsed),
+        "rss": []
+    }
+
+
+def print_report(runs):
+    header = f"{'config':<24}{'conc':>6}{'rps':>9}{'err%':>7}{'p50ms':>9}{'p90ms':>9}{'p99ms':>9}{'peak rss MB':>13}"
+    print(header)
+    print('-' * len(header))
+    for run in runs:
+        overall = run["summary"].get("all", {})
+        latency = overall.get("latency_ms", {})
+        config = f"{run['worker_class']} x{run['workers']}" if "worker_class" in run else run["target"]
+        peak_rss = max((sample["total_rss_mb"] for sample in run["rss"]), default=0.0)
+        print(
+            f"{config:<24}{run['concurrency']:>6}{overall.get('throughput_rps', 0):>9}"
+            f"{overall.get('error_rate', 0) * 100:>7.1f}{latency.get('p50') or 0:>9}"
+            f"{latency.get('p90') or 0:>9}{latency.get('p99') or 0:>9}{peak_rss:>13.1f}"
+        )
+
+
+def parse_list(value, cast=str):
+    return [cast(item) for item in value.split(',') if item]
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Load test /parse-resume and /generate-roadmap")
+    parser.add_argument('--corpus', help="Directory of sample resumes (default: generated text resumes)")
+    parser.add_argument('--mix', default='parse-resume=1,generate-roadmap=1',
+                        help="Endpoint weights, e.g. parse-resume=3,generate-roadmap=1")
+    parser.add_argument('--concurrency', default='4', help="Comma-separated concurrency levels")
+    parser.add_argument('--rate', type=float, default=0, help="Requests per second (open loop); 0 for closed loop")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds per configuration")
+    parser.add_argument('--timeout', type=float, default=60, help="Client timeout per request")
+    parser.add_argument('--worker-class', default='sync', help="Comma-separated gunicorn worker classes")
+    parser.add_argument('--workers', default='2', help="Comma-separated gunicorn worker counts")
+    parser.add_argument('--threads', type=int, default=4, help="Threads per worker for gthread workers")
+    parser.add_argument('--port', type=int, default=5055, help="Port gunicorn listens on")
+    parser.add_argument('--stub-port', type=int, default=0, help="Port of the stub providers (0 picks a free port)")
+    parser.add_argument('--rss-interval', type=float, default=1.0, help="Seconds between RSS samples")
+    parser.add_argument('--enable-resume-index', action='store_true',
+                        help="Allow near-duplicate parse reuse (off by default so every upload is fully parsed)")
+    parser.add_argument('--target', help="Base URL of an already running service instead of starting gunicorn")
+    parser.add_argument('--output', help="Write the full results as JSON to this path")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    mix = {}
+    for item in parse_list(args.mix):
+        endpoint, _, weight = item.partition('=')
+        mix[endpoint] = float(weight or 1)
+    corpus = load_corpus(args.corpus)
+
+    runs = []
+    if args.target:
+        for concurrency in parse_list(args.concurrency, int):
+            runs.append(run_against_target(args, mix, corpus, concurrency))
+    else:
+        stub = start_stub_server(port=args.stub_port, config=stub_config_from_args(args))
+        stub_url = f"http://127.0.0.1:{stub.server_address[1]}"
+        try:
+            for worker_class in parse_list(args.worker_class):
+                for workers in parse_list(args.workers, int):
+                    for concurrency in parse_list(args.concurrency, int):
+                        logger.info(f"Running {worker_class} x{workers} at concurrency {concurrency}")
+                        runs.append(run_configuration(args, mix, corpus, stub_url, worker_class, workers, concurrency))
+        finally:
+            stub.shutdown()
+
+    print_report(runs)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(runs, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+import os
+import sys
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Directory where profiles (and the inputs of slow requests) are written
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join('data', 'profiles'))
+
+# Fraction of requests profiled automatically (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+
+# Requests sending this value in the X-Profile header are always profiled
+PROFILE_ADMIN_TOKEN = os.environ.get('PROFILE_ADMIN_TOKEN')
+
+# Seconds between stack samples
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL', 0.005))
+
+# Maximum number of profiles kept on disk (oldest are deleted first)
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 200))
+
+# Profiled requests slower than this keep a copy of their input next to the profile
+PROFILE_OUTLIER_SECONDS = float(os.environ.get('PROFILE_OUTLIER_SECONDS', 5.0))
+
+PROFILE_HEADER = 'X-Profile'
+
+# Profiler of the request running on the current thread, if any
+_local = threading.local()
+
+
+class SamplingProfiler:
+    """Low-overhead profiler that periodically samples the stacks of a request's threads"""
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL):
+        # The request thread plus any pool threads currently working on its behalf
+        self.thread_ids = {thread_id}
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def add_thread(self, thread_id):
+        self.thread_ids.add(thread_id)
+
+    def remove_thread(self, thread_id):
+        self.thread_ids.discard(thread_id)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in tuple(self.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+    def collapsed(self):
+        """Return the samples in collapsed-stack format (one "frame;frame;frame count" per line)"""
+        return '\n'.join(f"{stack} {count}" for stack, count in sorted(self.stacks.items())) + '\n'
+
+
+class Profile:
+    """Outcome of a profiled request; id is None when the request was not profiled"""
+
+    def __init__(self):
+        self.id = None
+        self.duration = None
+
+
+def current_profiler():
+    """Return the profiler of the request running on this thread, or None"""
+    return getattr(_local, 'profiler', None)
+
+
+@contextmanager
+def sampled_by(profiler):
+    """Have a request's profiler sample the current thread too, e.g. a pool thread doing work for it"""
+    if profiler is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    profiler.add_thread(thread_id)
+    try:
+        yield
+    finally:
+        profiler.remove_thread(thread_id)
+
+
+def should_profile(headers):
+    """Decide whether a request is profiled, via the admin header or sampling"""
+    if PROFILE_ADMIN_TOKEN and headers.get(PROFILE_HEADER) == PROFILE_ADMIN_TOKEN:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def prune_profiles(directory=PROFILE_DIR, max_files=PROFILE_MAX_FILES):
+    """Delete the oldest profiles (and their inputs) beyond max_files"""
+    try:
+        files = os.listdir(directory)
+    except FileNotFoundError:
+        return
+    profile_ids = sorted(name[:-len('.collapsed')] for name in files if name.endswith('.collapsed'))
+    if len(profile_ids) <= max_files:
+        return
+
+    stale_ids = set(profile_ids[:len(profile_ids) - max_files])
+    for name in files:
+        if name.split('.', 1)[0] in stale_ids:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def write_profile(name, profiler, duration, input_data=None, input_suffix='bin'):
+    """Write a collapsed-stack profile, plus the input if the request was an outlier"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    # Zero-padded timestamp first so names sort chronologically
+    profile_id = f"{int(time.time() * 1000):015d}_{name}_{int(duration * 1000)}ms"
+
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.collapsed"), 'w') as f:
+        f.write(profiler.collapsed())
+
+    if input_data is not None and duration >= PROFILE_OUTLIER_SECONDS:
+        if isinstance(input_data, str):
+            input_data = input_data.encode('utf-8')
+        with open(os.path.join(PROFILE_DIR, f"{profile_id}.input.{input_suffix}"), 'wb') as f:
+            f.write(input_data)
+        logger.info(f"Kept input of slow request {profile_id} for later analysis")
+
+    prune_profiles()
+    return profile_id
+
+
+@contextmanager
+def profile_request(name, headers, input_data=None, input_suffix='bin'):
+    """Profile the enclosed block if the request opted in or was sampled"""
+    profile = Profile()
+    if not should_profile(headers):
+        yield profile
+        return
+
+    profiler = SamplingProfiler(threading.get_ident())
+    start_time = time.time()
+    profiler.start()
+    _local.profiler = profiler
+    try:
+        yield profile
+    finally:
+        _local.profiler = None
+        profiler.stop()
+        profile.duration = time.time() - start_time
+        try:
+            profile.id = write_profile(name, profiler, profile.duration, input_data, input_suffix)
+            logger.info(f"Profiled {name} in {profile.duration:.2f} seconds ({profiler.samples} samples): {profile.id}")
+        except Exception as e:
+            logger.error(f"Error writing profile for {name}: {e}")
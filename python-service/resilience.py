@@ -0,0 +1,221 @@
+import os
+import copy
+import time
+import logging
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from gunicorn_config import threads as WORKER_THREADS
+from profiling import current_profiler, sampled_by
+
+logger = logging.getLogger(__name__)
+
+# Each request thread can have a call and its hedge in flight, while abandoned attempts
+# run out their own timeout, so the pool is sized from the worker's thread count
+PROVIDER_MAX_THREADS = int(os.environ.get('PROVIDER_MAX_THREADS', 4 * WORKER_THREADS))
+
+# Shared pool for upstream calls, so a call (or its hedge) can be abandoned once it runs past its deadline
+_executor = ThreadPoolExecutor(max_workers=PROVIDER_MAX_THREADS, thread_name_prefix='provider')
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Trips on the error rate or slow-call rate over a rolling window, then probes before closing again"""
+
+    def __init__(self, name, window=20, min_calls=5, error_rate=0.5, slow_call_seconds=3.0, slow_call_rate=0.5,
+                 open_seconds=30.0, half_open_calls=1):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """Return whether a call may go upstream now"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.time() - self._opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self._probes = 0
+                logger.info(f"Circuit for {self.name} is half-open, probing upstream")
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    return False
+                self._probes += 1
+            return True
+
+    def cancel(self):
+        """Give back the probe slot of a call that never reached the upstream"""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record(self, success, latency):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if success and latency < self.slow_call_seconds:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    logger.info(f"Circuit for {self.name} closed")
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append((success, latency))
+            if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+                errors = sum(1 for ok, _ in self._outcomes if not ok)
+                slow = sum(1 for _, elapsed in self._outcomes if elapsed >= self.slow_call_seconds)
+                if errors / len(self._outcomes) >= self.error_rate or slow / len(self._outcomes) >= self.slow_call_rate:
+                    self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.time()
+        self._outcomes.clear()
+        logger.warning(f"Circuit for {self.name} opened for {self.open_seconds:.0f} seconds")
+
+
+class LatencyTracker:
+    """Derives call timeouts and hedge delays from recently observed latency percentiles"""
+
+    def __init__(self, window=200, min_samples=10, initial_timeout=5.0, min_timeout=0.5, max_timeout=10.0,
+                 timeout_multiplier=2.0):
+        self.min_samples = min_samples
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def percentile(self, pct):
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(pct / 100.0 * len(latencies)))]
+
+    def timeout(self):
+        """Overall deadline for a call: a multiple of p99, clamped"""
+        p99 = self.percentile(99)
+        if p99 is None:
+            return self.initial_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self):
+        """How long to wait before sending a duplicate request: p95, or half the timeout without data"""
+        p95 = self.percentile(95)
+        if p95 is None:
+            return self.initial_timeout / 2
+        return min(self.timeout(), max(self.min_timeout / 2, p95))
+
+
+class ResilientProvider:
+    """Wraps calls to one upstream with a circuit breaker, adaptive timeouts, hedging and a result cache"""
+
+    def __init__(self, name, hedging=True, cache_size=256, breaker=None, latency=None):
+        self.name = name
+        self.hedging = hedging
+        self.cache_size = cache_size
+        self.breaker = breaker or CircuitBreaker(name)
+        self.latency = latency or LatencyTracker()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def cached(self, key):
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                # Callers mutate resources while ranking them, so hand out copies
+                return copy.deepcopy(self._cache[key])
+        return None
+
+    def _store(self, key, value):
+        with self._cache_lock:
+            self._cache[key] = copy.deepcopy(value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _degraded(self, key, fallback):
+        cached = self.cached(key)
+        return cached if cached is not None else fallback()
+
+    def call(self, key, fetch, fallback):
+        """Return fetch(timeout), or cached/fallback data when the upstream is failing or too slow
+
+        fetch must raise on failure and honour the timeout it is given.
+        """
+        if not self.breaker.allow_request():
+            logger.info(f"Circuit for {self.name} is open, serving cached or fallback data")
+            return self._degraded(key, fallback)
+
+        timeout = self.latency.timeout()
+        deadline = time.time() + timeout
+        profiler = current_profiler()
+        started = []
+
+        def attempt(attempt_timeout):
+            # Latency is measured from when the fetch starts, so time queued for a pool
+            # thread is not blamed on the upstream
+            with sampled_by(profiler):
+                fetch_start = time.time()
+                started.append(fetch_start)
+                result = fetch(attempt_timeout)
+                return result, time.time() - fetch_start
+
+        futures = {_executor.submit(attempt, timeout)}
+        hedged = False
+        error = None
+
+        # Only hedge while the circuit is closed; half-open probes stay single
+        if self.hedging and self.breaker.state == CLOSED:
+            done, _ = wait(futures, timeout=min(self.latency.hedge_delay(), timeout))
+            if not done:
+                logger.info(f"{self.name} call is slow, sending hedged request")
+                futures.add(_executor.submit(attempt, max(0.1, deadline - time.time())))
+                hedged = True
+
+        while futures:
+            done, futures = wait(futures, timeout=max(0.0, deadline - time.time()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    result, latency = future.result()
+                    self.breaker.record(True, latency)
+                    self.latency.record(latency)
+                    self._store(key, result)
+                    return result
+                error = future.exception()
+
+        if not started:
+            # Every provider thread was busy; that says nothing about the upstream, and a
+            # half-open probe must be retried rather than leave the circuit stuck
+            logger.warning(f"{self.name} call did not start within {timeout:.1f} seconds, provider pool is saturated")
+            self.breaker.cancel()
+            return self._degraded(key, fallback)
+
+        latency = time.time() - min(started)
+        self.breaker.record(False, latency)
+        if error is not None:
+            logger.error(f"Error fetching {self.name} resources: {error}")
+        else:
+            logger.warning(f"{self.name} call timed out after {timeout:.1f} seconds{' (hedged)' if hedged else ''}")
+        return self._degraded(key, fallback)
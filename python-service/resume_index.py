@@ -0,0 +1,242 @@
+import os
+import re
+import json
+import time
+import fcntl
+import atexit
+import random
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# MinHash / LSH parameters. 16 bands of 8 rows gives an LSH candidate
+# threshold of roughly (1/16) ** (1/8) ~= 0.71 Jaccard similarity.
+NUM_PERMUTATIONS = 128
+NUM_BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // NUM_BANDS
+SHINGLE_SIZE = 5
+
+# Set RESUME_INDEX_ENABLED=0 to always run the full parse (no signatures are computed or persisted)
+RESUME_INDEX_ENABLED = os.environ.get('RESUME_INDEX_ENABLED', '1') != '0'
+
+# Estimated Jaccard similarity above which an upload is treated as a near-duplicate
+SIMILARITY_THRESHOLD = float(os.environ.get('RESUME_INDEX_THRESHOLD', 0.8))
+
+# Maximum number of resumes kept in the index (least recently used are evicted)
+MAX_ENTRIES = int(os.environ.get('RESUME_INDEX_MAX_ENTRIES', 500))
+
+INDEX_PATH = os.environ.get('RESUME_INDEX_PATH', os.path.join('data', 'resume_index.json'))
+
+# Seconds between background flushes of new entries to INDEX_PATH
+FLUSH_SECONDS = float(os.environ.get('RESUME_INDEX_FLUSH_SECONDS', 30))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures stay comparable across processes and restarts
+_rng = random.Random(1)
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def _stable_hash(value):
+    """Hash a string to a 32-bit integer that is stable across processes"""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=4).digest(), 'big')
+
+
+def shingles(text):
+    """Build the set of hashed word shingles for a text"""
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {_stable_hash(' '.join(words))} if words else set()
+    return {
+        _stable_hash(' '.join(words[i:i + SHINGLE_SIZE]))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signature(text):
+    """Compute the MinHash signature of a text"""
+    hashed_shingles = shingles(text)
+    if not hashed_shingles:
+        return [_MAX_HASH] * NUM_PERMUTATIONS
+
+    signature = []
+    for a, b in _PERMUTATIONS:
+        signature.append(min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashed_shingles))
+    return signature
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimate the Jaccard similarity of two texts from their signatures"""
+    matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return matches / float(NUM_PERMUTATIONS)
+
+
+def _band_keys(signature):
+    """Yield one bucket key per LSH band"""
+    for band in range(NUM_BANDS):
+        start = band * ROWS_PER_BAND
+        rows = signature[start:start + ROWS_PER_BAND]
+        yield f"{band}:" + ','.join(str(row) for row in rows)
+
+
+class ResumeIndex:
+    """Memory-bounded MinHash LSH index of previously parsed resumes
+
+    Entries are flushed to disk by a background thread. Each flush merges with the
+    entries other worker processes have written, under a file lock, so no worker
+    overwrites the others' view.
+    """
+
+    def __init__(self, path=INDEX_PATH, max_entries=MAX_ENTRIES, threshold=SIMILARITY_THRESHOLD,
+                 flush_seconds=FLUSH_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.flush_seconds = flush_seconds
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._flusher = None
+        with self._lock:
+            self._merge(self._read())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _read(self):
+        """Read the persisted entries as a list of (entry_id, entry)"""
+        if not self.path or not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get('entries', [])
+        except Exception as e:
+            logger.warning(f"Could not load resume index from {self.path}: {e}")
+            return []
+
+    def _merge(self, entries):
+        """Add entries this process does not know yet, then evict down to max_entries"""
+        for entry_id, entry in entries:
+            if entry_id not in self._entries:
+                self._insert(entry_id, entry)
+        # Keep the most recently used entries across all processes
+        for entry_id, _ in sorted(self._entries.items(), key=lambda item: item[1].get('last_used', 0)):
+            if len(self._entries) <= self.max_entries:
+                break
+            self._remove(entry_id)
+        self._entries = OrderedDict(sorted(self._entries.items(), key=lambda item: item[1].get('last_used', 0)))
+
+    def flush(self):
+        """Merge this process's entries with the persisted index and write it back"""
+        if not self.path or not self._dirty:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.lock', 'w') as lock_file:
+            # Serialise flushes across worker processes so none of them loses the others' entries
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            persisted = self._read()
+            with self._lock:
+                self._merge(persisted)
+                entries = list(self._entries.items())
+                self._dirty = False
+
+            # Write to a temporary file and rename so readers never see a partial index
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump({"entries": entries}, f)
+                os.replace(temp_path, self.path)
+            except Exception as e:
+                logger.warning(f"Could not persist resume index to {self.path}: {e}")
+                self._dirty = True
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    def _start_flusher(self):
+        if self._flusher is not None or not self.path or self.flush_seconds <= 0:
+            return
+        self._flusher = threading.Thread(target=self._flush_periodically, name='resume-index-flusher', daemon=True)
+        self._flusher.start()
+        # Don't lose entries added since the last periodic flush when the worker exits
+        atexit.register(self.flush)
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing resume index: {e}", exc_info=True)
+
+    def _insert(self, entry_id, entry):
+        self._entries[entry_id] = entry
+        for key in _band_keys(entry['signature']):
+            self._buckets.setdefault(key, set()).add(entry_id)
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in _band_keys(entry['signature']):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def find_similar(self, text, vocabulary_version=None):
+        """Return (entry, similarity) for the closest prior resume above the threshold, or (None, 0.0)
+
+        When vocabulary_version is given, only results parsed with that skill vocabulary are considered.
+        """
+        signature = minhash_signature(text)
+        with self._lock:
+            candidates = set()
+            for key in _band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+            if vocabulary_version is not None:
+                candidates = {
+                    entry_id for entry_id in candidates
+                    if self._entries[entry_id]['result'].get('vocabulary_version') == vocabulary_version
+                }
+
+            best_id, best_similarity = None, 0.0
+            for entry_id in candidates:
+                similarity = estimate_similarity(signature, self._entries[entry_id]['signature'])
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None or best_similarity < self.threshold:
+                return None, 0.0
+
+            self._entries[best_id]['last_used'] = time.time()
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id], best_similarity
+
+    def add(self, text, result):
+        """Index a parsed resume so later near-duplicate uploads can reuse its result"""
+        signature = minhash_signature(text)
+        entry_id = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+        entry = {
+            "signature": signature,
+            "last_used": time.time(),
+            "result": result
+        }
+        with self._lock:
+            self._remove(entry_id)
+            self._insert(entry_id, entry)
+            while len(self._entries) > self.max_entries:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+            self._dirty = True
+            self._start_flusher()
@@ -12,6 +12,8 @@ import textract
 import pandas as pd
 from sklearn.feature_extraction.text import CountVectorizer
 import string
+from resume_index import ResumeIndex, RESUME_INDEX_ENABLED
+from skill_vocabulary import VocabularyManager, tokenize
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -139,13 +141,56 @@ TECHNICAL_SKILLS = {
     ]
 }
 
-# Flatten the skills list for easier matching
-ALL_SKILLS = []
-for category in TECHNICAL_SKILLS.values():
-    ALL_SKILLS.extend(category)
+# Current skill vocabulary: starts from TECHNICAL_SKILLS and is hot-reloaded from
+# data/skills_vocabulary.json (or SKILL_VOCABULARY_PATH) when that file changes
+skill_vocabulary = VocabularyManager(TECHNICAL_SKILLS)
+skill_vocabulary.start_watching()
 
-# Remove duplicates
-ALL_SKILLS = list(set(ALL_SKILLS))
+# Parsing modes: "full" runs the spaCy pipeline, "fast" only does lexical skill matching
+PARSE_MODES = ["full", "fast"]
+
+# Common resume section headings, mapped to the section they start
+SECTION_HEADINGS = {
+    "summary": [
+        "summary", "professional summary", "profile", "professional profile", "about me", "objective",
+        "career objective", "career summary"
+    ],
+    "education": [
+        "education", "academic background", "academic qualifications", "educational background",
+        "educational qualifications", "qualifications", "academics", "education and training"
+    ],
+    "experience": [
+        "experience", "work experience", "professional experience", "employment", "employment history",
+        "work history", "career history", "relevant experience", "internships", "internship experience"
+    ],
+    "skills": [
+        "skills", "technical skills", "core skills", "key skills", "core competencies", "competencies",
+        "technologies", "tools and technologies", "technical proficiencies"
+    ],
+    "projects": ["projects", "personal projects", "academic projects", "key projects", "selected projects"],
+    "certifications": [
+        "certifications", "certificates", "licenses and certifications", "certifications and licenses",
+        "courses", "training"
+    ],
+    "other": [
+        "achievements", "awards", "honors", "honors and awards", "publications", "languages", "interests",
+        "hobbies", "activities", "extracurricular activities", "volunteer experience", "volunteering",
+        "references", "personal details", "contact", "contact information"
+    ]
+}
+
+HEADING_TO_SECTION = {
+    heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings
+}
+
+# Sections each extractor reads; extractors fall back to the full document when none are found
+SECTION_ROUTES = {
+    "education": ["education", "certifications"],
+    "experience": ["experience"]
+}
+
+# Index of previously parsed resumes, used to reuse results for near-duplicate uploads
+resume_index = ResumeIndex() if RESUME_INDEX_ENABLED else None
 
 def extract_text_from_pdf(pdf_path_or_bytes):
     """Extract text from PDF file or bytes"""
@@ -235,8 +280,80 @@ def preprocess_text(text):
     
     return text
 
+def detect_heading(line):
+    """Return the section a line starts if it is a known heading, otherwise None"""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 50:
+        return None
+    
+    # Drop bullets, rules and trailing colons used to decorate headings
+    normalized = re.sub(r'^[\W_]+|[\W_]+$', '', stripped).lower()
+    normalized = re.sub(r'\s*&\s*', ' and ', normalized)
+    normalized = re.sub(r'\s+', ' ', normalized)
+    if not normalized:
+        return None
+    
+    if normalized in HEADING_TO_SECTION:
+        return HEADING_TO_SECTION[normalized]
+    
+    # A short all-caps, title-case or colon-terminated line that starts with a known heading
+    # (e.g. "Skills & Tools"); other caps or colon lines such as "Responsibilities:" or an
+    # employer name stay in the current section
+    words = normalized.split()
+    looks_like_heading = stripped.isupper() or stripped.istitle() or stripped.endswith(':')
+    if len(words) <= 4 and looks_like_heading and not re.search(r'\d', stripped):
+        for length in range(len(words) - 1, 0, -1):
+            prefix = ' '.join(words[:length])
+            if prefix in HEADING_TO_SECTION:
+                return HEADING_TO_SECTION[prefix]
+    
+    return None
+
+def heading_style(line):
+    """Return the (all caps, colon-terminated) formatting of a heading line"""
+    stripped = re.sub(r'^[\W_]+', '', line.strip())
+    return stripped.isupper(), stripped.endswith(':')
+
+def segment_sections(text):
+    """Split resume text into sections in a single pass over its lines
+    
+    The first heading of a main section sets the document's heading style; later
+    headings only start a section when they share it, so sub-labels such as
+    "Achievements:" or "Technologies:" inside an "EXPERIENCE" section stay part of it.
+    """
+    sections = {}
+    current = "header"
+    found_heading = False
+    style = None
+    
+    for line in text.splitlines():
+        section = detect_heading(line)
+        if section is not None and (style is None or heading_style(line) == style):
+            current = section
+            if section != "other":
+                found_heading = True
+                style = style or heading_style(line)
+            continue
+        sections.setdefault(current, []).append(line)
+    
+    # Without any recognised heading the segmentation is not trustworthy
+    if not found_heading:
+        return {}
+    
+    return {section: '\n'.join(lines) for section, lines in sections.items()}
+
+def section_text(sections, extractor, text):
+    """Return the text an extractor should process, falling back to the full document"""
+    parts = [sections[section] for section in SECTION_ROUTES[extractor] if sections.get(section, '').strip()]
+    if not parts:
+        return text
+    return '\n'.join(parts)
+
 def extract_skills(text):
     """Extract skills from text using NLP techniques"""
+    # Use one vocabulary for the whole call, even if a reload swaps in a new one meanwhile
+    vocabulary = skill_vocabulary.current
+    
     # Preprocess text
     processed_text = preprocess_text(text)
     
@@ -247,16 +364,13 @@ def extract_skills(text):
     extracted_skills = set()
     
     # Method 1: Direct matching with our skills list
-    for skill in ALL_SKILLS:
-        # Use word boundary regex to match whole words
-        if re.search(r'\b' + re.escape(skill) + r'\b', processed_text):
-            extracted_skills.add(skill)
+    extracted_skills.update(match_skills(processed_text, vocabulary))
     
     # Method 2: Extract noun phrases as potential skills
     for chunk in doc.noun_chunks:
         chunk_text = chunk.text.lower()
         # Check if any skill is in the noun chunk
-        for skill in ALL_SKILLS:
+        for skill in vocabulary.all_skills:
             if skill in chunk_text:
                 extracted_skills.add(skill)
     
@@ -265,7 +379,7 @@ def extract_skills(text):
         if ent.label_ in ["ORG", "PRODUCT"]:
             ent_text = ent.text.lower()
             # Check if any skill matches this entity
-            for skill in ALL_SKILLS:
+            for skill in vocabulary.all_skills:
                 if skill in ent_text:
                     extracted_skills.add(skill)
     
@@ -277,24 +391,60 @@ def extract_skills(text):
     
     # Check if any of these n-grams match our skills
     for ngram in bigrams + trigrams:
-        if ngram in ALL_SKILLS:
+        if ngram in vocabulary.skill_set:
             extracted_skills.add(ngram)
     
+    return format_skills(extracted_skills, vocabulary)
+
+def extract_skills_fast(text):
+    """Extract skills with a pure lexical matcher, without spaCy"""
+    vocabulary = skill_vocabulary.current
+    tokens = tokenize(preprocess_text(text))
+    
+    extracted_skills = set()
+    for i in range(len(tokens)):
+        for length in range(1, min(vocabulary.fast_max_tokens, len(tokens) - i) + 1):
+            skill = vocabulary.fast_index.get(tuple(tokens[i:i + length]))
+            if skill is not None:
+                extracted_skills.add(skill)
+        # Also match the parts of hyphenated or dotted tokens, like the regex word boundaries do
+        if '-' in tokens[i] or '.' in tokens[i]:
+            for part in re.split(r'[.\-]', tokens[i]):
+                skill = vocabulary.fast_index.get((part,))
+                if skill is not None:
+                    extracted_skills.add(skill)
+    
+    return format_skills(extracted_skills, vocabulary)
+
+def match_skills(processed_text, vocabulary=None):
+    """Match the skills list against preprocessed text using word boundary regexes"""
+    vocabulary = vocabulary or skill_vocabulary.current
+    matched_skills = set()
+    for skill, pattern in vocabulary.patterns:
+        # Use word boundary regex to match whole words
+        if pattern.search(processed_text):
+            matched_skills.add(skill)
+    return matched_skills
+
+def format_skills(extracted_skills, vocabulary=None):
+    """Format and categorize a set of lowercase skills"""
+    vocabulary = vocabulary or skill_vocabulary.current
+    
     # Convert skills to title case for better display
     formatted_skills = [skill.title() for skill in extracted_skills]
     
     # Categorize skills
     categorized_skills = {}
     for skill in extracted_skills:
-        for category, skills_list in TECHNICAL_SKILLS.items():
-            if skill in skills_list:
-                if category not in categorized_skills:
-                    categorized_skills[category] = []
-                categorized_skills[category].append(skill.title())
+        for category in vocabulary.skill_categories.get(skill, []):
+            if category not in categorized_skills:
+                categorized_skills[category] = []
+            categorized_skills[category].append(skill.title())
     
     return {
         "skills": sorted(formatted_skills),
-        "categorized_skills": categorized_skills
+        "categorized_skills": categorized_skills,
+        "vocabulary_version": vocabulary.version
     }
 
 def extract_education(text):
@@ -400,9 +550,40 @@ def extract_experience(text):
     
     return experience
 
-def parse_resume(file_path_or_bytes, file_extension=None):
-    """Parse resume and extract relevant information"""
+def reparse_near_duplicate(text, previous):
+    """Build a parse result from a near-duplicate resume, reusing its education and experience"""
+    previous_result = previous["result"]
+    vocabulary = skill_vocabulary.current
+    
+    # The regex pass is cheap, so run it over the whole new text
+    processed_text = preprocess_text(text)
+    extracted_skills = match_skills(processed_text, vocabulary)
+    
+    # Skills found earlier only by the spaCy passes are kept while the text still mentions them
+    for skill in previous_result["skills"]:
+        skill = skill.lower()
+        if skill not in extracted_skills and skill in processed_text:
+            extracted_skills.add(skill)
+    skills_data = format_skills(extracted_skills, vocabulary)
+    
+    return {
+        "success": True,
+        "skills": skills_data["skills"],
+        "categorized_skills": skills_data["categorized_skills"],
+        "vocabulary_version": skills_data["vocabulary_version"],
+        "education": previous_result["education"],
+        "experience": previous_result["experience"]
+    }
+
+def parse_resume(file_path_or_bytes, file_extension=None, mode="full"):
+    """Parse resume and extract relevant information
+    
+    mode="fast" skips spaCy and only returns skills and categorized skills.
+    """
     try:
+        if mode not in PARSE_MODES:
+            raise ValueError(f"Unknown parse mode: {mode}")
+        
         # Extract text from resume
         text = extract_text_from_resume(file_path_or_bytes, file_extension)
         
@@ -412,22 +593,49 @@ def parse_resume(file_path_or_bytes, file_extension=None):
                 "error": "Could not extract sufficient text from the resume"
             }
         
+        if mode == "fast":
+            skills_data = extract_skills_fast(text)
+            return {
+                "success": True,
+                "mode": "fast",
+                "skills": skills_data["skills"],
+                "categorized_skills": skills_data["categorized_skills"],
+                "vocabulary_version": skills_data["vocabulary_version"]
+            }
+        
+        # Reuse the result of a near-duplicate upload parsed with the current vocabulary
+        if resume_index is not None:
+            previous, similarity = resume_index.find_similar(text, skill_vocabulary.current.version)
+        else:
+            previous, similarity = None, 0.0
+        if previous is not None:
+            logger.info(f"Resume is a near-duplicate of a previous upload (similarity {similarity:.2f})")
+            return reparse_near_duplicate(text, previous)
+        
         # Extract skills from text
         skills_data = extract_skills(text)
         
+        # Split the resume into sections so each extractor only sees the part it needs
+        sections = segment_sections(text)
+        
         # Extract education information
-        education_data = extract_education(text)
+        education_data = extract_education(section_text(sections, "education", text))
         
         # Extract experience information
-        experience_data = extract_experience(text)
+        experience_data = extract_experience(section_text(sections, "experience", text))
         
-        return {
+        result = {
             "success": True,
             "skills": skills_data["skills"],
             "categorized_skills": skills_data["categorized_skills"],
+            "vocabulary_version": skills_data["vocabulary_version"],
             "education": education_data,
             "experience": experience_data
         }
+        
+        if resume_index is not None:
+            resume_index.add(text, result)
+        return result
     except Exception as e:
         logger.error(f"Error parsing resume: {e}", exc_info=True)
         return {
@@ -0,0 +1,127 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# External vocabulary, in the same shape as TECHNICAL_SKILLS: {"category": ["skill", ...], ...}
+SKILL_VOCABULARY_PATH = os.environ.get('SKILL_VOCABULARY_PATH', os.path.join('data', 'skills_vocabulary.json'))
+
+# Seconds between checks of the vocabulary file for changes
+SKILL_VOCABULARY_POLL_SECONDS = float(os.environ.get('SKILL_VOCABULARY_POLL_SECONDS', 5))
+
+
+def tokenize(processed_text):
+    """Split preprocessed text into tokens, keeping dotted and hyphenated terms together"""
+    return re.findall(r'[a-z0-9]+(?:[.\-][a-z0-9]+)*', processed_text)
+
+
+def validate_vocabulary(data):
+    """Check and normalize a vocabulary mapping, raising ValueError if it is malformed"""
+    if not isinstance(data, dict) or not data:
+        raise ValueError("Vocabulary must be a non-empty object of category -> list of skills")
+
+    categories = {}
+    for category, skills in data.items():
+        if not isinstance(category, str) or not category.strip():
+            raise ValueError(f"Invalid category name: {category!r}")
+        if not isinstance(skills, list) or not skills:
+            raise ValueError(f"Category {category!r} must be a non-empty list of skills")
+        normalized = []
+        for skill in skills:
+            if not isinstance(skill, str) or not skill.strip():
+                raise ValueError(f"Invalid skill {skill!r} in category {category!r}")
+            skill = skill.strip().lower()
+            if skill not in normalized:
+                normalized.append(skill)
+        categories[category.strip()] = normalized
+    return categories
+
+
+class SkillVocabulary:
+    """Skill lists compiled into the lookup structures used by the extractors; never mutated after creation"""
+
+    def __init__(self, technical_skills):
+        self.technical_skills = {category: tuple(skills) for category, skills in technical_skills.items()}
+        self.version = hashlib.sha256(
+            json.dumps(self.technical_skills, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12]
+
+        self.skill_categories = {}
+        for category, skills in self.technical_skills.items():
+            for skill in skills:
+                self.skill_categories.setdefault(skill, []).append(category)
+        self.all_skills = sorted(self.skill_categories)
+        self.skill_set = frozenset(self.all_skills)
+
+        # Word boundary patterns for direct matching
+        self.patterns = [(skill, re.compile(r'\b' + re.escape(skill) + r'\b')) for skill in self.all_skills]
+
+        # Token tuples for the lexical matcher; skills whose punctuation is stripped
+        # by preprocess_text (e.g. "c++") can never match and are left out
+        self.fast_index = {}
+        for skill in self.all_skills:
+            tokens = tuple(tokenize(skill))
+            if tokens and ' '.join(tokens) == skill:
+                self.fast_index[tokens] = skill
+        self.fast_max_tokens = max((len(tokens) for tokens in self.fast_index), default=1)
+
+
+class VocabularyManager:
+    """Holds the current vocabulary and swaps in a new one when the vocabulary file changes"""
+
+    def __init__(self, default_skills, path=SKILL_VOCABULARY_PATH, poll_seconds=SKILL_VOCABULARY_POLL_SECONDS):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._current = SkillVocabulary(validate_vocabulary(default_skills))
+        self._mtime = None
+        self._thread = None
+        self.reload()
+
+    @property
+    def current(self):
+        # A single attribute read, so callers always get one complete vocabulary
+        return self._current
+
+    def reload(self):
+        """Load the vocabulary file if it changed; returns True if a new vocabulary was swapped in"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        mtime = os.path.getmtime(self.path)
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+
+        try:
+            with open(self.path, 'r') as f:
+                vocabulary = SkillVocabulary(validate_vocabulary(json.load(f)))
+        except (OSError, ValueError) as e:
+            logger.error(f"Ignoring invalid skill vocabulary {self.path}: {e}")
+            return False
+
+        if vocabulary.version == self._current.version:
+            return False
+        previous_version = self._current.version
+        self._current = vocabulary
+        logger.info(f"Skill vocabulary updated from {previous_version} to {vocabulary.version} "
+                    f"({len(vocabulary.all_skills)} skills)")
+        return True
+
+    def start_watching(self):
+        """Poll the vocabulary file in a background thread"""
+        if self._thread is not None or self.poll_seconds <= 0:
+            return
+        self._thread = threading.Thread(target=self._watch, name='skill-vocabulary-watcher', daemon=True)
+        self._thread.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Error reloading skill vocabulary: {e}", exc_info=True)
@@ -0,0 +1,146 @@
+"""Local stand-in for the YouTube Data and Custom Search APIs, used for load testing.
+
+Point the service at it with:
+    YOUTUBE_API_ENDPOINT=http://127.0.0.1:8089/youtube/v3/
+    CUSTOM_SEARCH_URL=http://127.0.0.1:8089/customsearch/v1
+"""
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+class StubConfig:
+    """Latency and error injection settings shared by all stub requests"""
+
+    def __init__(self, latency_ms=100, jitter_ms=50, error_rate=0.0, error_status=503, hang_rate=0.0, hang_seconds=30):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+
+    def delay(self):
+        """Return how long to wait before answering a request, in seconds"""
+        if self.hang_rate > 0 and random.random() < self.hang_rate:
+            return self.hang_seconds
+        return max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000.0
+
+
+def youtube_search_response(query, max_results):
+    """Build a response shaped like youtube.search().list()"""
+    items = []
+    for i in range(max_results):
+        items.append({
+            "id": {"kind": "youtube#video", "videoId": f"stub{i:07d}"},
+            "snippet": {
+                "title": f"{query} - part {i + 1}",
+                "description": f"Stub video {i + 1} for {query}",
+                "thumbnails": {"medium": {"url": f"https://i.ytimg.com/vi/stub{i:07d}/mqdefault.jpg"}},
+                "channelTitle": "Stub Channel",
+                "publishedAt": "2024-01-01T00:00:00Z"
+            }
+        })
+    return {"kind": "youtube#searchListResponse", "items": items}
+
+
+def custom_search_response(query, num):
+    """Build a response shaped like the Custom Search JSON API"""
+    items = []
+    for i in range(num):
+        items.append({
+            "title": f"{query} - result {i + 1}",
+            "snippet": f"Stub search result {i + 1} for {query}",
+            "link": f"https://stub{i}.example.com/{i}",
+            "displayLink": f"stub{i}.example.com"
+        })
+    return {"kind": "customsearch#search", "items": items}
+
+
+def make_handler(config):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            params = parse_qs(parsed.query)
+            query = params.get('q', ['stub'])[0]
+
+            time.sleep(config.delay())
+
+            if config.error_rate > 0 and random.random() < config.error_rate:
+                self._send(config.error_status, {"error": {"code": config.error_status, "message": "Injected error"}})
+            elif parsed.path.startswith('/youtube/') and parsed.path.endswith('/search'):
+                self._send(200, youtube_search_response(query, int(params.get('maxResults', [5])[0])))
+            elif parsed.path.startswith('/customsearch/'):
+                self._send(200, custom_search_response(query, int(params.get('num', [5])[0])))
+            else:
+                self._send(404, {"error": {"code": 404, "message": f"Unknown path {parsed.path}"}})
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode('utf-8')
+            try:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client gave up (e.g. timed out) before we answered
+                pass
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return StubHandler
+
+
+def start_stub_server(host='127.0.0.1', port=8089, config=None):
+    """Start the stub server on a background thread and return it"""
+    server = ThreadingHTTPServer((host, port), make_handler(config or StubConfig()))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='stub-providers', daemon=True)
+    thread.start()
+    logger.info(f"Stub providers listening on http://{host}:{server.server_address[1]}")
+    return server
+
+
+def add_stub_arguments(parser):
+    parser.add_argument('--stub-latency-ms', type=float, default=100, help="Mean upstream latency")
+    parser.add_argument('--stub-jitter-ms', type=float, default=50, help="Standard deviation of upstream latency")
+    parser.add_argument('--stub-error-rate', type=float, default=0.0, help="Fraction of upstream calls that fail")
+    parser.add_argument('--stub-error-status', type=int, default=503, help="HTTP status of injected errors")
+    parser.add_argument('--stub-hang-rate', type=float, default=0.0, help="Fraction of upstream calls that hang")
+    parser.add_argument('--stub-hang-seconds', type=float, default=30, help="How long hanging calls take")
+
+
+def stub_config_from_args(args):
+    return StubConfig(
+        latency_ms=args.stub_latency_ms,
+        jitter_ms=args.stub_jitter_ms,
+        error_rate=args.stub_error_rate,
+        error_status=args.stub_error_status,
+        hang_rate=args.stub_hang_rate,
+        hang_seconds=args.stub_hang_seconds
+    )
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Stub YouTube and Custom Search API server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.host, args.port, stub_config_from_args(args))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,133 @@
+import time
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import resilience
+from resilience import CircuitBreaker, ResilientProvider, CLOSED, OPEN, HALF_OPEN
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def make_breaker(self):
+        return CircuitBreaker('test', window=10, min_calls=4, error_rate=0.5, slow_call_seconds=1.0,
+                              open_seconds=0.05, half_open_calls=1)
+
+    def trip(self, breaker):
+        for _ in range(4):
+            breaker.record(False, 0.01)
+
+    def test_opens_on_error_rate(self):
+        breaker = self.make_breaker()
+        breaker.record(True, 0.01)
+        breaker.record(False, 0.01)
+        breaker.record(True, 0.01)
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record(False, 0.01)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow_request())
+
+    def test_opens_on_slow_call_rate(self):
+        breaker = self.make_breaker()
+        for _ in range(4):
+            breaker.record(True, 2.0)
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_half_open_probe_closes_on_success(self):
+        breaker = self.make_breaker()
+        self.trip(breaker)
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        # Only one probe at a time
+        self.assertFalse(breaker.allow_request())
+        breaker.record(True, 0.01)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+    def test_half_open_probe_reopens_on_failure(self):
+        breaker = self.make_breaker()
+        self.trip(breaker)
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        breaker.record(False, 0.01)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow_request())
+
+    def test_half_open_probe_reopens_when_slow(self):
+        breaker = self.make_breaker()
+        self.trip(breaker)
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        breaker.record(True, 2.0)
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_cancelled_probe_can_be_retried(self):
+        breaker = self.make_breaker()
+        self.trip(breaker)
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        breaker.cancel()
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+
+
+class ResilientProviderTest(unittest.TestCase):
+
+    def setUp(self):
+        # A single provider thread that tests can block to simulate a saturated pool
+        self.original_executor = resilience._executor
+        resilience._executor = ThreadPoolExecutor(max_workers=1)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        resilience._executor.shutdown(wait=True)
+        resilience._executor = self.original_executor
+
+    def make_provider(self):
+        provider = ResilientProvider('test', hedging=False, breaker=CircuitBreaker(
+            'test', window=10, min_calls=4, open_seconds=0.05, half_open_calls=1))
+        provider.latency.initial_timeout = 0.1
+        return provider
+
+    def test_saturated_pool_does_not_trip_breaker(self):
+        provider = self.make_provider()
+        resilience._executor.submit(self.release.wait)
+        for _ in range(6):
+            self.assertEqual(provider.call('key', lambda timeout: 'fresh', lambda: 'fallback'), 'fallback')
+        self.assertEqual(provider.breaker.state, CLOSED)
+
+    def test_probe_that_never_started_does_not_stick_half_open(self):
+        provider = self.make_provider()
+        for _ in range(4):
+            provider.breaker.record(False, 0.01)
+        self.assertEqual(provider.breaker.state, OPEN)
+        time.sleep(0.06)
+
+        # The probe is queued behind a busy provider thread and never starts
+        resilience._executor.submit(self.release.wait)
+        self.assertEqual(provider.call('key', lambda timeout: 'fresh', lambda: 'fallback'), 'fallback')
+        self.assertEqual(provider.breaker.state, HALF_OPEN)
+
+        # Once the pool drains, the next call probes the healthy upstream and closes the circuit
+        self.release.set()
+        time.sleep(0.05)
+        self.assertEqual(provider.call('key', lambda timeout: 'fresh', lambda: 'fallback'), 'fresh')
+        self.assertEqual(provider.breaker.state, CLOSED)
+
+    def test_failed_probe_reopens(self):
+        provider = self.make_provider()
+        for _ in range(4):
+            provider.breaker.record(False, 0.01)
+        time.sleep(0.06)
+
+        def failing(timeout):
+            raise IOError("upstream down")
+
+        self.assertEqual(provider.call('key', failing, lambda: 'fallback'), 'fallback')
+        self.assertEqual(provider.breaker.state, OPEN)
+
+
+if __name__ == '__main__':
+    unittest.main()